@@ -0,0 +1,74 @@
+"""Micro-benchmark of the model input building on the inference path: polars -> pandas vs polars -> numpy.
+
+A calibrated LightGBM model is trained on synthetic data with the schema of the preprocessed request in
+`data/test_json.json`, then the time and the memory allocated per request are measured for both input paths.
+
+Usage:
+    python -m benchmarks.input_encoding
+"""
+
+import json
+import pathlib
+import timeit
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+import polars as pl
+from lightgbm import LGBMClassifier
+from sklearn.calibration import CalibratedClassifierCV
+
+from src.fraud_detection.inference.encoding import ModelInputEncoder
+from src.fraud_detection.preprocessing.inference import prepare_data_for_inference
+
+REPEATS: int = 1000
+
+
+def build_request() -> tuple[dict[str, str | int | bool | float], list[str]]:
+    with (pathlib.Path(__file__).parents[1] / "data" / "test_json.json").open("r") as f:
+        request: dict[str, str | int | bool | float] = json.load(f)
+    return request, list(request)
+
+
+def build_model(features: pl.DataFrame, rows: int = 2000) -> CalibratedClassifierCV:
+    rng: np.random.Generator = np.random.default_rng(42)
+    data: dict[str, np.ndarray] = {}
+    for column, dtype in features.schema.items():
+        if dtype == pl.Categorical:
+            data[column] = rng.choice([features.item(0, column), "unknown", "other"], size=rows)
+        else:
+            data[column] = rng.normal(float(features.item(0, column)), 10, size=rows)
+    training: pl.DataFrame = pl.DataFrame(data).with_columns(pl.col(pl.String).cast(pl.Categorical))
+    target: np.ndarray = rng.integers(0, 2, size=rows)
+    classifier = CalibratedClassifierCV(LGBMClassifier(n_estimators=100, verbose=-1), cv=3)
+    return classifier.fit(training.to_pandas(), target)
+
+
+def measure(name: str, function: Callable[[], object]) -> None:
+    function()
+    seconds: float = min(timeit.repeat(function, number=REPEATS, repeat=3)) / REPEATS
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<32} {seconds * 1e6:>10.1f} us/request {peak / 1024:>10.1f} KiB peak allocated")
+
+
+def main() -> None:
+    request, columns = build_request()
+    features: pl.DataFrame = prepare_data_for_inference(request, columns)
+    model: CalibratedClassifierCV = build_model(features)
+    encoder: ModelInputEncoder = ModelInputEncoder.from_model(model, columns)
+
+    np.testing.assert_allclose(model.predict_proba(encoder.encode(features)), model.predict_proba(features.to_pandas()))
+
+    measure("to_pandas", features.to_pandas)
+    measure("encode", lambda: encoder.encode(features))
+    measure("to_pandas + predict_proba", lambda: model.predict_proba(features.to_pandas()))
+    measure("encode + predict_proba", lambda: model.predict_proba(encoder.encode(features)))
+
+
+if __name__ == "__main__":
+    main()
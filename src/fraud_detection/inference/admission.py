@@ -0,0 +1,189 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+DEADLINE_HEADER: str = "X-Request-Deadline-Ms"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted, carrying the HTTP status code to answer with."""
+
+    def __init__(self, status_code: int, reason: str) -> None:
+        super().__init__(reason)
+        self.status_code: int = status_code
+        self.reason: str = reason
+
+
+class AdmissionController:
+    """Limits the number of requests processed at the same time, with a bounded wait queue and deadline awareness.
+
+    A request is rejected with 429 when the wait queue is full, and with 503 when its deadline cannot be met, either
+    because it already passed, because the expected wait is longer than the time left or because the deadline expires
+    while waiting in the queue. The expected wait is estimated from an exponentially weighted moving average of the
+    service time.
+
+    Requests served by threads wait with `admit`, requests served by an event loop wait with `admit_async`, without
+    taking a thread while queued. A controller is meant to be used with only one of the two.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, smoothing: float = 0.1) -> None:
+        self.max_in_flight: int = max_in_flight
+        self.max_queue: int = max_queue
+        self.smoothing: float = smoothing
+        self.in_flight: int = 0
+        self.queued: int = 0
+        self.service_time: float = 0.0
+        self.rejected: dict[int, int] = {429: 0, 503: 0}
+        self._condition: threading.Condition = threading.Condition()
+        self._async_condition: asyncio.Condition | None = None
+
+    def _expected_wait(self) -> float:
+        return self.service_time * (self.queued // self.max_in_flight + 1)
+
+    def _reject(self, status_code: int, reason: str) -> AdmissionRejected:
+        self.rejected[status_code] += 1
+        return AdmissionRejected(status_code, reason)
+
+    def _check_arrival(self, deadline: float | None) -> bool:
+        """Rejects the request if it cannot be admitted at all, and returns whether it has to wait in the queue."""
+        if deadline is not None and time.monotonic() >= deadline:
+            raise self._reject(503, "The request deadline already passed when the request arrived")
+        if self.in_flight < self.max_in_flight:
+            return False
+        if self.queued >= self.max_queue:
+            raise self._reject(429, "Too many requests waiting to be processed")
+        if deadline is not None and time.monotonic() + self._expected_wait() > deadline:
+            raise self._reject(503, "The request deadline cannot be met")
+        return True
+
+    def _timeout(self, deadline: float | None) -> float | None:
+        if deadline is None:
+            return None
+        timeout: float = deadline - time.monotonic()
+        if timeout <= 0:
+            raise self._reject(503, "The request deadline expired while waiting in the queue")
+        return timeout
+
+    def _release(self, start: float) -> None:
+        self.in_flight -= 1
+        self.service_time += self.smoothing * (time.monotonic() - start - self.service_time)
+
+    @contextmanager
+    def admit(self, deadline: float | None = None) -> Iterator[None]:
+        """Waits for a free slot and holds it for the duration of the context.
+
+        Args:
+            deadline: The `time.monotonic` instant after which the caller is no longer interested in the response.
+
+        Raises:
+            AdmissionRejected: If the request is rejected.
+        """
+        with self._condition:
+            if self._check_arrival(deadline):
+                self.queued += 1
+                try:
+                    while True:
+                        timeout: float | None = self._timeout(deadline)
+                        if self.in_flight < self.max_in_flight:
+                            break
+                        self._condition.wait(timeout)
+                except AdmissionRejected:
+                    # hand a slot freed at the same time over to the next request waiting in the queue
+                    self._condition.notify()
+                    raise
+                finally:
+                    self.queued -= 1
+            self.in_flight += 1
+
+        start: float = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._release(start)
+                self._condition.notify()
+
+    @asynccontextmanager
+    async def admit_async(self, deadline: float | None = None) -> AsyncIterator[None]:
+        """Same as `admit`, waiting for a free slot on the running event loop.
+
+        Args:
+            deadline: The `time.monotonic` instant after which the caller is no longer interested in the response.
+
+        Raises:
+            AdmissionRejected: If the request is rejected.
+        """
+        if self._async_condition is None:
+            self._async_condition = asyncio.Condition()
+
+        async with self._async_condition:
+            if self._check_arrival(deadline):
+                self.queued += 1
+                try:
+                    while True:
+                        timeout: float | None = self._timeout(deadline)
+                        if self.in_flight < self.max_in_flight:
+                            break
+                        try:
+                            await asyncio.wait_for(self._async_condition.wait(), timeout)
+                        except TimeoutError:
+                            pass
+                except AdmissionRejected:
+                    self._async_condition.notify()
+                    raise
+                finally:
+                    self.queued -= 1
+            self.in_flight += 1
+
+        start: float = time.monotonic()
+        try:
+            yield
+        finally:
+            async with self._async_condition:
+                self._release(start)
+                self._async_condition.notify()
+
+    def to_dict(self) -> dict[str, int | float]:
+        with self._condition:
+            return {
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "service_time_ms": self.service_time * 1000,
+                "rejected_429": self.rejected[429],
+                "rejected_503": self.rejected[503],
+            }
+
+
+def parse_deadline(header: str | None) -> float | None:
+    """Converts the value of the deadline header, the milliseconds the client is willing to wait, in a
+    `time.monotonic` instant. When the header is missing, the `ADMISSION_DEFAULT_DEADLINE_MS` environment variable is
+    used, if set.
+
+    Args:
+        header: The value of the deadline header.
+
+    Returns:
+        float | None: The deadline, or None if the request has no deadline or the value is not a finite number.
+    """
+    header = header or os.getenv("ADMISSION_DEFAULT_DEADLINE_MS")
+    if not header:
+        return None
+    try:
+        milliseconds: float = float(header)
+    except ValueError:
+        return None
+    # infinite deadlines overflow the condition wait, NaN deadlines would skip every deadline check
+    if not math.isfinite(milliseconds):
+        return None
+    return time.monotonic() + milliseconds / 1000
+
+
+def create_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", str(os.cpu_count() or 1))),
+        max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "32")),
+    )
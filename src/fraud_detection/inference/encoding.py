@@ -0,0 +1,57 @@
+import numpy as np
+import polars as pl
+from sklearn.calibration import CalibratedClassifierCV
+
+
+class ModelInputEncoder:
+    """Builds the input matrix of the model directly from the preprocessed polars dataframe, without going through
+    pandas.
+
+    The matrix is a C-contiguous float64 array with the columns in the order the model was trained on. Categorical
+    columns are encoded with the same codes LightGBM assigned to the pandas categories during training, unseen
+    categories and nulls are encoded as NaN, which is how LightGBM treats them when predicting on pandas dataframes.
+    """
+
+    def __init__(self, columns: list[str], categories: dict[str, list[str]]) -> None:
+        self.columns: list[str] = columns
+        self.categories: dict[str, dict[str, int]] = {
+            column: {category: code for code, category in enumerate(values)} for column, values in categories.items()
+        }
+        self._numeric_indices: list[int] = [i for i, column in enumerate(columns) if column not in categories]
+        self._numeric_columns: list[str] = [columns[i] for i in self._numeric_indices]
+        self._categorical_indices: list[int] = [i for i, column in enumerate(columns) if column in categories]
+
+    @classmethod
+    def from_model(cls, model: CalibratedClassifierCV, columns: list[str]) -> "ModelInputEncoder":
+        """Creates the encoder from the categories stored in the LightGBM booster of the calibrated model.
+
+        Args:
+            model: The calibrated model whose estimators are LightGBM classifiers.
+            columns: The columns of the model, in training order.
+
+        Returns:
+            ModelInputEncoder: The encoder of the model inputs.
+        """
+        booster = model.calibrated_classifiers_[0].estimator.booster_
+        categorical_columns: list[str] = [columns[index] for index in booster.params.get("categorical_column", [])]
+        return cls(columns, dict(zip(categorical_columns, booster.pandas_categorical or [])))
+
+    def encode(self, dataframe: pl.DataFrame) -> np.ndarray:
+        """Encodes the dataframe in the input matrix of the model.
+
+        Args:
+            dataframe: The preprocessed dataframe, with one or more rows.
+
+        Returns:
+            np.ndarray: The input matrix, of shape (rows, columns).
+        """
+        matrix: np.ndarray = np.empty((dataframe.height, len(self.columns)), dtype=np.float64)
+        if self._numeric_columns:
+            numeric: pl.DataFrame = dataframe.select(pl.col(self._numeric_columns).cast(pl.Float64))
+            matrix[:, self._numeric_indices] = numeric.to_numpy()
+        for index in self._categorical_indices:
+            column: str = self.columns[index]
+            codes: dict[str, int] = self.categories[column]
+            values: list[str | None] = dataframe.get_column(column).cast(pl.String).to_list()
+            matrix[:, index] = [codes.get(value, np.nan) for value in values]
+        return matrix
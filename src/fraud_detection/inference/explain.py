@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
+
+
+class ExplanationStats:
+    """Thread safe accumulator of the cost of the explanations computed by the server."""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.over_budget: int = 0
+        self.skipped: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def update(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def update_over_budget(self, skipped: bool) -> None:
+        with self._lock:
+            self.over_budget += 1
+            self.skipped += int(skipped)
+
+    def to_dict(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "count": self.count,
+                "over_budget": self.over_budget,
+                "skipped": self.skipped,
+                "mean_ms": self.total_ms / self.count if self.count else 0.0,
+                "max_ms": self.max_ms,
+            }
+
+
+explanation_stats: ExplanationStats = ExplanationStats()
+
+# explanations run one at a time in a dedicated worker, so that the request waits for them at most the time budget
+_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+_worker_lock: threading.Lock = threading.Lock()
+
+
+def _compute_contributions(model: CalibratedClassifierCV, data: np.ndarray) -> np.ndarray:
+    start: float = time.perf_counter()
+    contributions: np.ndarray = np.mean(
+        [
+            calibrated_classifier.estimator.predict(data, pred_contrib=True)[0]
+            for calibrated_classifier in model.calibrated_classifiers_
+        ],
+        axis=0,
+    )
+    explanation_stats.update((time.perf_counter() - start) * 1000)
+    # the last value is the expected value (bias) of the model
+    return contributions[:-1]
+
+
+def _release_worker(_: Future) -> None:
+    _worker_lock.release()
+
+
+def explain_prediction(
+    model: CalibratedClassifierCV,
+    data: np.ndarray,
+    feature_names: list[str],
+    top_k: int | None = None,
+    time_budget_ms: float | None = None,
+) -> dict[str, list[dict[str, str | float]] | bool | float]:
+    """Computes the top contributing features of a single prediction with the native LightGBM TreeSHAP.
+
+    The contributions are computed with `pred_contrib` on the LightGBM estimators inside the calibrated model and
+    averaged. They are expressed in raw score (log-odds) space, before calibration. The computation runs in a single
+    background worker and the request waits, for the worker to be free and then for the computation, at most the time
+    budget: if the budget runs out, no features are returned and the explanation is marked as not complete.
+    The actual cost of every computation, including the ones over budget, is tracked in `explanation_stats`.
+
+    Args:
+        model: The calibrated model whose estimators are LightGBM classifiers.
+        data: The single row input matrix of the model.
+        feature_names: The names of the columns of the input matrix.
+        top_k: The number of features to return, defaults to the `EXPLAIN_TOP_K` environment variable.
+        time_budget_ms: The time budget of the explanation, defaults to the `EXPLAIN_TIME_BUDGET_MS` environment
+            variable.
+
+    Returns:
+        dict: The top features sorted by absolute contribution, whether they were computed within the time budget and
+        the time the request spent waiting for them.
+    """
+    if top_k is None:
+        top_k = int(os.getenv("EXPLAIN_TOP_K", "5"))
+    if time_budget_ms is None:
+        time_budget_ms = float(os.getenv("EXPLAIN_TIME_BUDGET_MS", "20"))
+
+    start: float = time.perf_counter()
+    if not _worker_lock.acquire(timeout=time_budget_ms / 1000):
+        explanation_stats.update_over_budget(skipped=True)
+        return {"features": [], "complete": False, "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    future: Future = _executor.submit(_compute_contributions, model, data)
+    future.add_done_callback(_release_worker)
+    try:
+        remaining_budget: float = max(time_budget_ms / 1000 - (time.perf_counter() - start), 0.0)
+        contributions: np.ndarray = future.result(timeout=remaining_budget)
+    except FutureTimeoutError:
+        explanation_stats.update_over_budget(skipped=False)
+        return {"features": [], "complete": False, "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    top_features: np.ndarray = np.argsort(-np.abs(contributions))[:top_k]
+    return {
+        "features": [
+            {"feature": feature_names[index], "contribution": float(contributions[index])} for index in top_features
+        ],
+        "complete": True,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
@@ -3,11 +3,18 @@ import os
 import pathlib
 import pickle
 
+import numpy as np
+import polars as pl
 from sklearn.calibration import CalibratedClassifierCV
 
+from src.fraud_detection.inference.encoding import ModelInputEncoder
+from src.fraud_detection.inference.monitoring import DriftMonitor, compute_reference
+from src.fraud_detection.inference.shadow import ShadowScorer
+from src.fraud_detection.preprocessing.normalization import NormalizationLookup
 
-def load_model() -> CalibratedClassifierCV:
-    model_path: pathlib.Path = pathlib.Path(os.getenv("MODEL_PATH"))
+
+def load_model(model_path: pathlib.Path | None = None) -> CalibratedClassifierCV:
+    model_path = model_path or pathlib.Path(os.getenv("MODEL_PATH"))
 
     if not model_path.exists():
         raise FileNotFoundError(f"model path does not exist at path: {model_path}")
@@ -20,6 +27,19 @@ def load_model() -> CalibratedClassifierCV:
     return classifier
 
 
+def load_shadow_scorer(columns: list[str]) -> ShadowScorer | None:
+    if not os.getenv("SHADOW_MODEL_PATHS"):
+        return None
+
+    models: dict[str, tuple[CalibratedClassifierCV, ModelInputEncoder]] = {}
+    for model_path in [pathlib.Path(path) for path in os.getenv("SHADOW_MODEL_PATHS").split(",")]:
+        if model_path.stem in models:
+            raise ValueError(f"shadow model name {model_path.stem} is duplicated, model files must have unique names")
+        model: CalibratedClassifierCV = load_model(model_path)
+        models[model_path.stem] = (model, ModelInputEncoder.from_model(model, columns))
+    return ShadowScorer(models, max_queue=int(os.getenv("SHADOW_MAX_QUEUE", "128")))
+
+
 def load_columns() -> list[str]:
     columns_path: pathlib.Path = pathlib.Path(os.getenv("COLUMNS_PATH"))
     if not columns_path.exists():
@@ -31,3 +51,55 @@ def load_columns() -> list[str]:
     with columns_path.open("r") as f:
         columns: list[str] = json.loads(f.readline().replace("'", '"'))
     return columns
+
+
+def load_normalization_lookup() -> NormalizationLookup:
+    lookup: NormalizationLookup = NormalizationLookup(maxsize=int(os.getenv("NORMALIZATION_CACHE_SIZE", "4096")))
+    if not os.getenv("NORMALIZATION_VOCABULARY_PATH"):
+        return lookup
+
+    vocabulary_path: pathlib.Path = pathlib.Path(os.getenv("NORMALIZATION_VOCABULARY_PATH"))
+    if not vocabulary_path.is_file():
+        raise FileNotFoundError(f"{vocabulary_path} does not exists or is not a file")
+
+    with vocabulary_path.open("r") as f:
+        lookup.warm(json.load(f))
+    return lookup
+
+
+def load_drift_monitor(model: CalibratedClassifierCV, encoder: ModelInputEncoder) -> DriftMonitor | None:
+    """Loads the drift monitor, seeded with the reference distributions saved at `MONITORING_REFERENCE_PATH`.
+
+    If the reference does not exist yet, it is computed once from the processed training data at
+    `PROCESSED_DATA_PATH`, scoring a sample of `MONITORING_SCORE_SAMPLE_SIZE` rows evenly spread over the data with
+    the model, and saved. If neither is available, monitoring is disabled. The PSI is reported once a histogram holds
+    `MONITORING_MIN_SAMPLES` values.
+    """
+    if not os.getenv("MONITORING_REFERENCE_PATH"):
+        return None
+
+    reference_path: pathlib.Path = pathlib.Path(os.getenv("MONITORING_REFERENCE_PATH"))
+    if not reference_path.is_file():
+        data_path: pathlib.Path = pathlib.Path(os.getenv("PROCESSED_DATA_PATH", ""))
+        if not data_path.is_file():
+            return None
+
+        data: pl.LazyFrame = pl.scan_parquet(data_path)
+        sample_size: int = int(os.getenv("MONITORING_SCORE_SAMPLE_SIZE", "10000"))
+        # the processed data is sorted by time, a strided sample covers the whole period and not just its start
+        rows: int = data.select(pl.len()).collect().item()
+        step: int = max(rows // sample_size, 1)
+        sample: pl.DataFrame = data.select(encoder.columns).gather_every(step).head(sample_size).collect()
+        scores: np.ndarray = model.predict_proba(encoder.encode(sample))[:, 1]
+
+        reference: dict = compute_reference(
+            data,
+            numeric_columns=os.getenv("MONITORING_NUMERIC_COLUMNS", "TransactionAmt,id_02").split(","),
+            categorical_columns=os.getenv("MONITORING_CATEGORICAL_COLUMNS", "id_31,P_emaildomain").split(","),
+            scores=scores,
+        )
+        with reference_path.open("w") as f:
+            json.dump(reference, f)
+
+    with reference_path.open("r") as f:
+        return DriftMonitor(json.load(f), min_samples=int(os.getenv("MONITORING_MIN_SAMPLES", "100")))
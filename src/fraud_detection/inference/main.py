@@ -1,19 +1,59 @@
 import logging
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
+import anyio.to_thread
 import fastapi
 import numpy as np
-import pandas as pd
+import polars as pl
 import uvicorn
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from sklearnex import patch_sklearn
 
-from src.fraud_detection.inference.loaders import load_columns, load_model
+from src.fraud_detection.inference.admission import (
+    DEADLINE_HEADER,
+    AdmissionRejected,
+    create_admission_controller,
+    parse_deadline,
+)
+from src.fraud_detection.inference.encoding import ModelInputEncoder
+from src.fraud_detection.inference.explain import explain_prediction, explanation_stats
+from src.fraud_detection.inference.loaders import (
+    load_columns,
+    load_drift_monitor,
+    load_model,
+    load_normalization_lookup,
+    load_shadow_scorer,
+)
+from src.fraud_detection.inference.profiling import ADMIN_TOKEN_HEADER, create_profiler, is_admin
 from src.fraud_detection.preprocessing.inference import prepare_data_for_inference
 
-app = fastapi.FastAPI(title="fraud-detection model", description="Api that performs fraud detection", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(_: fastapi.FastAPI) -> AsyncIterator[None]:
+    # admitted requests run in the threadpool, which must not make them wait for a thread
+    limiter: anyio.CapacityLimiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, admission_controller.max_in_flight)
+    yield
+
+
+app = fastapi.FastAPI(
+    title="fraud-detection model",
+    description="Api that performs fraud detection",
+    version="1.0.0",
+    lifespan=lifespan,
+)
 patch_sklearn()
 model = load_model()
 columns = load_columns()
+encoder = ModelInputEncoder.from_model(model, columns)
+lookup = load_normalization_lookup()
+admission_controller = create_admission_controller()
+drift_monitor = load_drift_monitor(model, encoder)
+shadow_scorer = load_shadow_scorer(columns)
+profiler = create_profiler()
 
 
 @app.get("/health")
@@ -21,17 +61,91 @@ async def predict() -> dict[str, str]:
     return {"message": "Healthy"}
 
 
+@app.get("/metrics")
+async def metrics() -> dict[str, dict[str, int | float | dict]]:
+    return {
+        "explanations": explanation_stats.to_dict(),
+        "admission": admission_controller.to_dict(),
+        "shadow": shadow_scorer.to_dict() if shadow_scorer is not None else {},
+    }
+
+
+@app.get("/drift")
+async def drift() -> dict[str, str | int | dict]:
+    if drift_monitor is None:
+        return {"message": "Drift monitoring is disabled"}
+    return {"message": "Drift computed successfully", "data": drift_monitor.to_dict()}
+
+
+@app.post("/admin/profile")
+async def start_profiling(
+    seconds: float | None = fastapi.Query(default=None, gt=0, allow_inf_nan=False),
+    requests: int | None = fastapi.Query(default=None, gt=0),
+    token: str | None = fastapi.Header(default=None, alias=ADMIN_TOKEN_HEADER),
+) -> dict[str, str | dict]:
+    if not is_admin(token):
+        return JSONResponse(status_code=403, content={"message": "Forbidden"})
+
+    try:
+        profiler.start(seconds, requests)
+    except RuntimeError as e:
+        return JSONResponse(status_code=409, content={"message": "Profiling not started", "error": str(e)})
+    return {"message": "Profiling started", "data": profiler.status()}
+
+
+@app.get("/admin/profile")
+async def profiling_status(
+    token: str | None = fastapi.Header(default=None, alias=ADMIN_TOKEN_HEADER),
+) -> dict[str, str | dict]:
+    if not is_admin(token):
+        return JSONResponse(status_code=403, content={"message": "Forbidden"})
+    return {"message": "Profiling status", "data": profiler.status()}
+
+
 @app.post("/predict")
-async def predict(data: dict[str, str | int | bool | float]) -> dict[str, str | dict[str, int | float]]:
+async def predict(
+    data: dict[str, str | int | bool | float],
+    background_tasks: fastapi.BackgroundTasks,
+    explain: bool = False,
+    deadline: str | None = fastapi.Header(default=None, alias=DEADLINE_HEADER),
+) -> dict[str, str | dict[str, int | float | dict]]:
     try:
-        data: pd.DataFrame = prepare_data_for_inference(data, columns).to_pandas()
+        # requests wait for admission on the event loop, and only the admitted ones take a thread
+        async with admission_controller.admit_async(parse_deadline(deadline)):
+            return await run_in_threadpool(predict_admitted, data, explain, background_tasks)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=e.status_code, content={"message": "Request rejected", "error": e.reason}
+        )
+
+
+@profiler.wrap
+def predict_admitted(
+    data: dict[str, str | int | bool | float], explain: bool, background_tasks: fastapi.BackgroundTasks
+) -> dict[str, str | dict[str, int | float | dict]]:
+    try:
+        features: pl.DataFrame = prepare_data_for_inference(data, columns, lookup)
+        data: np.ndarray = encoder.encode(features)
 
         prediction_probability: np.ndarray = model.predict_proba(data)[0]
 
         prediction: bool = bool(prediction_probability[1] > float(os.getenv("THRESHOLD", "0.5")))
         probability: float = float(prediction_probability[1]) if prediction else float(prediction_probability[0])
 
-        return {"message": "Prediction successfully", "data": {"class": prediction, "probability": probability}}
+        if drift_monitor is not None:
+            drift_monitor.update(
+                features.select(drift_monitor.columns).row(0, named=True), float(prediction_probability[1])
+            )
+
+        results: dict = {"class": prediction, "probability": probability}
+        if explain and prediction:
+            results["explanation"] = explain_prediction(model, data, encoder.columns)
+
+        if shadow_scorer is not None:
+            # the shadow models start scoring only after the response is sent
+            background_tasks.add_task(shadow_scorer.submit, features, float(prediction_probability[1]))
+
+        return {"message": "Prediction successfully", "data": results}
 
     except Exception as e:
         logging.error("Error inside the predict function")
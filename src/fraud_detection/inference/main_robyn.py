@@ -1,13 +1,29 @@
 import json
 import logging
+import math
 import os
 
 import numpy as np
-import pandas as pd
-from robyn import Request, Robyn
+import polars as pl
+from robyn import Headers, Request, Response, Robyn
 from sklearnex import patch_sklearn
 
-from src.fraud_detection.inference.loaders import load_columns, load_model
+from src.fraud_detection.inference.admission import (
+    DEADLINE_HEADER,
+    AdmissionRejected,
+    create_admission_controller,
+    parse_deadline,
+)
+from src.fraud_detection.inference.encoding import ModelInputEncoder
+from src.fraud_detection.inference.explain import explain_prediction, explanation_stats
+from src.fraud_detection.inference.loaders import (
+    load_columns,
+    load_drift_monitor,
+    load_model,
+    load_normalization_lookup,
+    load_shadow_scorer,
+)
+from src.fraud_detection.inference.profiling import ADMIN_TOKEN_HEADER, create_profiler, is_admin
 from src.fraud_detection.preprocessing.inference import prepare_data_for_inference
 
 app = Robyn(__file__)
@@ -15,6 +31,34 @@ app = Robyn(__file__)
 patch_sklearn()
 model = load_model()
 columns = load_columns()
+encoder = ModelInputEncoder.from_model(model, columns)
+lookup = load_normalization_lookup()
+admission_controller = create_admission_controller()
+drift_monitor = load_drift_monitor(model, encoder)
+shadow_scorer = load_shadow_scorer(columns)
+profiler = create_profiler()
+
+
+def parse_positive_query_param(request: Request, name: str, cast: type[int] | type[float]) -> int | float | None:
+    """Parses an optional query parameter that must be a finite positive number, raising ValueError otherwise."""
+    value: str | None = request.query_params.get(name, None)
+    if not value:
+        return None
+    try:
+        number: int | float = cast(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value}") from None
+    if not math.isfinite(number) or number <= 0:
+        raise ValueError(f"{name} must be a finite positive number, got {value}")
+    return number
+
+
+def json_response(status_code: int, content: dict) -> Response:
+    return Response(
+        status_code=status_code,
+        headers=Headers({"Content-Type": "application/json"}),
+        description=json.dumps(content),
+    )
 
 
 @app.get("/health")
@@ -22,14 +66,65 @@ async def predict() -> dict[str, str]:
     return {"message": "Healthy"}
 
 
+@app.get("/metrics")
+async def metrics() -> dict[str, dict[str, int | float | dict]]:
+    return {
+        "explanations": explanation_stats.to_dict(),
+        "admission": admission_controller.to_dict(),
+        "shadow": shadow_scorer.to_dict() if shadow_scorer is not None else {},
+    }
+
+
+@app.get("/drift")
+async def drift() -> dict[str, str | int | dict]:
+    if drift_monitor is None:
+        return {"message": "Drift monitoring is disabled"}
+    return {"message": "Drift computed successfully", "data": drift_monitor.to_dict()}
+
+
+@app.post("/admin/profile")
+def start_profiling(request: Request) -> dict[str, str | dict] | Response:
+    if not is_admin(request.headers.get(ADMIN_TOKEN_HEADER)):
+        return json_response(403, {"message": "Forbidden"})
+
+    try:
+        seconds: float | None = parse_positive_query_param(request, "seconds", float)
+        requests: int | None = parse_positive_query_param(request, "requests", int)
+    except ValueError as e:
+        return json_response(400, {"message": "Profiling not started", "error": str(e)})
+
+    try:
+        profiler.start(seconds, requests)
+    except RuntimeError as e:
+        return json_response(409, {"message": "Profiling not started", "error": str(e)})
+    return {"message": "Profiling started", "data": profiler.status()}
+
+
+@app.get("/admin/profile")
+def profiling_status(request: Request) -> dict[str, str | dict] | Response:
+    if not is_admin(request.headers.get(ADMIN_TOKEN_HEADER)):
+        return json_response(403, {"message": "Forbidden"})
+    return {"message": "Profiling status", "data": profiler.status()}
+
+
 @app.post("/predict")
-def predict(request: Request) -> dict[str, str | dict[str, int | float]]:
+def predict(request: Request) -> dict[str, str | dict[str, int | float]] | Response:
+    try:
+        with admission_controller.admit(parse_deadline(request.headers.get(DEADLINE_HEADER))):
+            return predict_admitted(request)
+    except AdmissionRejected as e:
+        return json_response(e.status_code, {"message": "Request rejected", "error": e.reason})
+
+
+@profiler.wrap
+def predict_admitted(request: Request) -> dict[str, str | dict[str, int | float]]:
     try:
         data: dict = json.loads(request.body)
 
         logging.error(f"data: {data}")
 
-        data: pd.DataFrame = prepare_data_for_inference(data, columns).to_pandas()
+        features: pl.DataFrame = prepare_data_for_inference(data, columns, lookup)
+        data: np.ndarray = encoder.encode(features)
         prediction_probability: np.ndarray = model.predict_proba(data)[0]
 
         logging.error(f"prediction_probability: {prediction_probability}")
@@ -38,8 +133,22 @@ def predict(request: Request) -> dict[str, str | dict[str, int | float]]:
 
         logging.error(f"prediction: {prediction}")
         probability: float = float(prediction_probability[1]) if prediction else float(prediction_probability[0])
+
+        if drift_monitor is not None:
+            drift_monitor.update(
+                features.select(drift_monitor.columns).row(0, named=True), float(prediction_probability[1])
+            )
         logging.error(f"results: {prediction}, {probability}")
-        return {"message": "Prediction successfully", "data": {"class": prediction, "probability": probability}}
+
+        results: dict = {"class": prediction, "probability": probability}
+        if request.query_params.get("explain", "false").lower() == "true" and prediction:
+            results["explanation"] = explain_prediction(model, data, encoder.columns)
+
+        # Robyn has no background tasks, the shadow models are handed the request as the last step before returning
+        if shadow_scorer is not None:
+            shadow_scorer.submit(features, float(prediction_probability[1]))
+
+        return {"message": "Prediction successfully", "data": results}
 
     except Exception as e:
         logging.error("Error inside the predict function")
@@ -0,0 +1,208 @@
+import bisect
+import math
+import threading
+from typing import Any
+
+import numpy as np
+import polars as pl
+
+OTHER_CATEGORY: str = "__other__"
+_EPSILON: float = 1e-4
+
+
+def population_stability_index(expected: list[float], actual: list[float]) -> float:
+    """Computes the population stability index between two distributions defined on the same bins.
+
+    Args:
+        expected: The proportions of the reference distribution.
+        actual: The proportions of the live distribution.
+
+    Returns:
+        float: The PSI, values above 0.1 indicate a moderate shift and above 0.25 a significant shift.
+    """
+    psi: float = 0.0
+    for expected_proportion, actual_proportion in zip(expected, actual):
+        expected_proportion = max(expected_proportion, _EPSILON)
+        actual_proportion = max(actual_proportion, _EPSILON)
+        psi += (actual_proportion - expected_proportion) * math.log(actual_proportion / expected_proportion)
+    return psi
+
+
+class StreamingHistogram:
+    """Histogram with fixed bins, defined by the reference quantiles, whose counts are updated one value at a time."""
+
+    def __init__(self, edges: list[float]) -> None:
+        self.edges: list[float] = edges
+        self.counts: list[int] = [0] * (len(edges) + 1)
+        self.total: int = 0
+
+    def update(self, value: float) -> None:
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+        self.total += 1
+
+    def proportions(self) -> list[float]:
+        return [count / self.total if self.total else 0.0 for count in self.counts]
+
+
+class HeavyHitters:
+    """Space-Saving sketch that keeps the approximate counts of the `capacity` most frequent values of a stream."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity: int = capacity
+        self.counts: dict[str, int] = {}
+
+    def update(self, value: str) -> None:
+        if value in self.counts or len(self.counts) < self.capacity:
+            self.counts[value] = self.counts.get(value, 0) + 1
+            return
+        # replace the least frequent value, inheriting its count as an upper bound of the error
+        least_frequent: str = min(self.counts, key=self.counts.get)
+        self.counts[value] = self.counts.pop(least_frequent) + 1
+
+    def top(self) -> dict[str, int]:
+        return dict(sorted(self.counts.items(), key=lambda item: item[1], reverse=True))
+
+
+class CategoricalHistogram:
+    """Counts of the reference categories, with all the other values counted together, plus the live heavy hitters."""
+
+    def __init__(self, categories: list[str], capacity: int) -> None:
+        self.categories: list[str] = categories
+        self.counts: dict[str, int] = {category: 0 for category in [*categories, OTHER_CATEGORY]}
+        self.heavy_hitters: HeavyHitters = HeavyHitters(capacity)
+        self.total: int = 0
+
+    def update(self, value: str) -> None:
+        self.counts[value if value in self.counts else OTHER_CATEGORY] += 1
+        self.heavy_hitters.update(value)
+        self.total += 1
+
+    def proportions(self) -> list[float]:
+        return [count / self.total if self.total else 0.0 for count in self.counts.values()]
+
+
+class DriftMonitor:
+    """In-process monitor of the drift of the live features and scores with respect to the training distributions.
+
+    Every update costs constant time and the memory used does not grow with the number of requests. The PSI of a
+    histogram with fewer than `min_samples` values is not reported, since it would only measure the sampling noise.
+    """
+
+    def __init__(self, reference: dict[str, dict[str, Any]], capacity: int = 20, min_samples: int = 100) -> None:
+        self.reference: dict[str, dict[str, Any]] = reference
+        self.min_samples: int = max(min_samples, 1)
+        self.numeric: dict[str, StreamingHistogram] = {
+            column: StreamingHistogram(values["edges"]) for column, values in reference["numeric"].items()
+        }
+        self.categorical: dict[str, CategoricalHistogram] = {
+            column: CategoricalHistogram([c for c in values["proportions"] if c != OTHER_CATEGORY], capacity)
+            for column, values in reference["categorical"].items()
+        }
+        self.score: StreamingHistogram = StreamingHistogram(reference["score"]["edges"])
+        self.columns: list[str] = [*self.numeric, *self.categorical]
+        self._lock: threading.Lock = threading.Lock()
+
+    def _psi(self, expected: list[float], histogram: StreamingHistogram | CategoricalHistogram) -> float | None:
+        if histogram.total < self.min_samples:
+            return None
+        return population_stability_index(expected, histogram.proportions())
+
+    def update(self, values: dict[str, Any], score: float) -> None:
+        """Updates the sketches with the features and the score of a single prediction.
+
+        Args:
+            values: The preprocessed values of the monitored columns.
+            score: The predicted probability of the positive class.
+        """
+        with self._lock:
+            for column, histogram in self.numeric.items():
+                if values.get(column) is not None:
+                    histogram.update(float(values[column]))
+            for column, histogram in self.categorical.items():
+                if values.get(column) is not None:
+                    histogram.update(str(values[column]))
+            self.score.update(score)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the PSI of every monitored column and of the score, together with the live heavy hitters. The PSI
+        is None until the histogram holds at least `min_samples` values."""
+        with self._lock:
+            features: dict[str, dict[str, Any]] = {
+                column: {
+                    "count": histogram.total,
+                    "psi": self._psi(self.reference["numeric"][column]["proportions"], histogram),
+                }
+                for column, histogram in self.numeric.items()
+            }
+            for column, histogram in self.categorical.items():
+                features[column] = {
+                    "count": histogram.total,
+                    "psi": self._psi(list(self.reference["categorical"][column]["proportions"].values()), histogram),
+                    "heavy_hitters": histogram.heavy_hitters.top(),
+                }
+
+            score_proportions: list[float] | None = self.reference["score"]["proportions"]
+            return {
+                "count": self.score.total,
+                "features": features,
+                "score": {
+                    "psi": self._psi(score_proportions, self.score) if score_proportions is not None else None,
+                    "edges": self.score.edges,
+                    "proportions": self.score.proportions(),
+                },
+            }
+
+
+def _quantile_reference(values: np.ndarray, bins: int) -> dict[str, list[float]]:
+    edges: list[float] = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])).tolist()
+    counts: np.ndarray = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+    return {"edges": edges, "proportions": (counts / counts.sum()).tolist()}
+
+
+def compute_reference(
+    data: pl.LazyFrame,
+    numeric_columns: list[str],
+    categorical_columns: list[str],
+    scores: np.ndarray | None = None,
+    bins: int = 10,
+    top_k: int = 20,
+) -> dict[str, dict[str, Any]]:
+    """Computes the reference distributions of the monitored columns and of the scores from the training data.
+
+    The numeric columns are binned on their deciles (by default), the categorical columns keep the proportions of the
+    `top_k` most frequent categories, with all the others grouped together.
+
+    Args:
+        data: The processed training data.
+        numeric_columns: The numeric columns to monitor.
+        categorical_columns: The categorical columns to monitor.
+        scores: The predicted probabilities on (a sample of) the training data, if available.
+        bins: The number of quantile bins of numeric columns and scores.
+        top_k: The number of categories to keep for categorical columns.
+
+    Returns:
+        dict[str, dict[str, Any]]: The reference distributions.
+    """
+    collected: pl.DataFrame = data.select(*numeric_columns, *categorical_columns).collect()
+
+    reference: dict[str, dict[str, Any]] = {"numeric": {}, "categorical": {}}
+    for column in numeric_columns:
+        values: np.ndarray = collected.get_column(column).drop_nulls().cast(pl.Float64).to_numpy()
+        reference["numeric"][column] = _quantile_reference(values, bins)
+
+    for column in categorical_columns:
+        value_counts: pl.DataFrame = (
+            collected.get_column(column).drop_nulls().cast(pl.String).value_counts(sort=True).rename({column: "value"})
+        )
+        total: int = value_counts.get_column("count").sum()
+        proportions: dict[str, float] = {
+            value: count / total for value, count in value_counts.head(top_k).iter_rows()
+        }
+        proportions[OTHER_CATEGORY] = max(1.0 - sum(proportions.values()), 0.0)
+        reference["categorical"][column] = {"proportions": proportions}
+
+    if scores is not None:
+        reference["score"] = _quantile_reference(scores, bins)
+    else:
+        reference["score"] = {"edges": np.linspace(0, 1, bins + 1)[1:-1].tolist(), "proportions": None}
+    return reference
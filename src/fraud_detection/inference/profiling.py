@@ -0,0 +1,154 @@
+import cProfile
+import functools
+import hmac
+import os
+import pathlib
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Callable
+
+ADMIN_TOKEN_HEADER: str = "X-Admin-Token"
+
+
+def is_admin(token: str | None) -> bool:
+    """Checks the given token against the `ADMIN_TOKEN` environment variable. If it is not set, nobody is admin."""
+    admin_token: str | None = os.getenv("ADMIN_TOKEN")
+    return bool(admin_token) and token is not None and hmac.compare_digest(token, admin_token)
+
+
+class Profiler:
+    """On-demand profiler of the live server, wrapping the predict handler.
+
+    A session lasts for a number of seconds or of profiled requests, whichever comes first, and writes to `output_dir`
+    a `.prof` file, readable with snakeviz, and a `.collapsed` file of the sampled stacks, readable by flamegraph tools.
+    The requests are profiled with cProfile, one at a time since only one cProfile profiler can be active at once, while
+    a background thread samples the stacks of all the threads serving a request. Since Python 3.12 cProfile is built on
+    `sys.monitoring`, which is process-wide: while a profiled request runs, the `.prof` file also records the calls of
+    every other thread of the process, including the event loop and the other requests in flight, and all of them pay
+    the profiling overhead. The `.collapsed` file only contains the threads serving a request. When no session is
+    active, the wrapped handler only pays for an attribute check.
+    """
+
+    def __init__(self, output_dir: pathlib.Path, sample_interval: float = 0.005, max_seconds: float = 300) -> None:
+        self.output_dir: pathlib.Path = output_dir
+        self.sample_interval: float = sample_interval
+        self.max_seconds: float = max_seconds
+        self.active: bool = False
+        self.last_files: list[str] = []
+        self._requests: int = 0
+        self._max_requests: int | None = None
+        self._stats: pstats.Stats | None = None
+        self._stacks: Counter[str] = Counter()
+        self._threads: set[int] = set()
+        self._stop: threading.Event = threading.Event()
+        self._lock: threading.Lock = threading.Lock()
+        self._cprofile_lock: threading.Lock = threading.Lock()
+
+    def start(self, seconds: float | None = None, requests: int | None = None) -> None:
+        """Starts a profiling session.
+
+        Args:
+            seconds: The duration of the session, capped to `max_seconds`.
+            requests: The number of requests to profile.
+
+        Raises:
+            RuntimeError: If a session is already active.
+        """
+        with self._lock:
+            if self.active:
+                raise RuntimeError("A profiling session is already active")
+            self._requests = 0
+            self._max_requests = requests
+            self._stats = None
+            self._stacks = Counter()
+            self._stop.clear()
+            self.active = True
+
+        duration: float = min(seconds or self.max_seconds, self.max_seconds)
+        threading.Thread(target=self._sample, args=(time.monotonic() + duration,), name="profiler", daemon=True).start()
+
+    def status(self) -> dict[str, bool | int | list[str]]:
+        with self._lock:
+            return {"active": self.active, "requests": self._requests, "last_files": self.last_files}
+
+    def wrap(self, function: Callable[..., Any]) -> Callable[..., Any]:
+        """Decorates the handler so that its calls are profiled while a session is active."""
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not self.active:
+                return function(*args, **kwargs)
+            return self._profile_call(function, *args, **kwargs)
+
+        return wrapper
+
+    def _profile_call(self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        thread_id: int = threading.get_ident()
+        with self._lock:
+            self._threads.add(thread_id)
+
+        # the profile records every thread of the process while enabled, the lock only keeps a single one active
+        profile: cProfile.Profile | None = cProfile.Profile() if self._cprofile_lock.acquire(blocking=False) else None
+        try:
+            if profile is not None:
+                profile.enable()
+            return function(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._cprofile_lock.release()
+            with self._lock:
+                self._threads.discard(thread_id)
+                if self.active:
+                    self._requests += 1
+                    if profile is not None:
+                        self._stats = pstats.Stats(profile) if self._stats is None else self._stats.add(profile)
+                    if self._max_requests is not None and self._requests >= self._max_requests:
+                        self._stop.set()
+
+    def _sample(self, deadline: float) -> None:
+        while not self._stop.wait(self.sample_interval) and time.monotonic() < deadline:
+            frames: dict[int, FrameType] = sys._current_frames()
+            with self._lock:
+                for thread_id in self._threads:
+                    if thread_id in frames:
+                        self._stacks[_collapse(frames[thread_id])] += 1
+        self._finish()
+
+    def _finish(self) -> None:
+        with self._lock:
+            self.active = False
+            stats, stacks = self._stats, self._stacks
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        name: str = f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        files: list[str] = []
+        if stats is not None:
+            stats.dump_stats(self.output_dir / f"{name}.prof")
+            files.append(str(self.output_dir / f"{name}.prof"))
+        with (self.output_dir / f"{name}.collapsed").open("w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in stacks.items())
+        files.append(str(self.output_dir / f"{name}.collapsed"))
+
+        with self._lock:
+            self.last_files = files
+
+
+def _collapse(frame: FrameType | None) -> str:
+    stack: list[str] = []
+    while frame is not None:
+        stack.append(f"{frame.f_code.co_filename}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def create_profiler() -> Profiler:
+    return Profiler(
+        output_dir=pathlib.Path(os.getenv("PROFILING_DIR", "/tmp/profiles")),
+        sample_interval=float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5")) / 1000,
+        max_seconds=float(os.getenv("PROFILING_MAX_SECONDS", "300")),
+    )
@@ -0,0 +1,103 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+import polars as pl
+from sklearn.calibration import CalibratedClassifierCV
+
+from src.fraud_detection.inference.encoding import ModelInputEncoder
+
+
+class ShadowStats:
+    """Aggregated agreement and latency of a shadow model with respect to the primary model."""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.agreements: int = 0
+        self.errors: int = 0
+        self.total_absolute_difference: float = 0.0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+
+    def update(self, primary_score: float, shadow_score: float, threshold: float, elapsed_ms: float) -> None:
+        self.count += 1
+        self.agreements += int((primary_score > threshold) == (shadow_score > threshold))
+        self.total_absolute_difference += abs(primary_score - shadow_score)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def to_dict(self) -> dict[str, int | float]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "agreement": self.agreements / self.count if self.count else 0.0,
+            "mean_absolute_difference": self.total_absolute_difference / self.count if self.count else 0.0,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+        }
+
+
+class ShadowScorer:
+    """Scores the live traffic with candidate models in a background worker, off the critical path of the primary model.
+
+    Requests are handed over through a bounded queue: when the queue is full the shadow work is shed, so the primary
+    responses are never slowed down by the shadow models.
+    """
+
+    def __init__(
+        self, models: dict[str, tuple[CalibratedClassifierCV, ModelInputEncoder]], max_queue: int = 128
+    ) -> None:
+        self.models: dict[str, tuple[CalibratedClassifierCV, ModelInputEncoder]] = models
+        self.stats: dict[str, ShadowStats] = {name: ShadowStats() for name in models}
+        self.shed: int = 0
+        self._queue: queue.Queue[tuple[pl.DataFrame, float]] = queue.Queue(maxsize=max_queue)
+        self._lock: threading.Lock = threading.Lock()
+        self._worker: threading.Thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._worker.start()
+
+    def submit(self, data: pl.DataFrame, primary_score: float) -> bool:
+        """Enqueues the input of a prediction to be scored by the shadow models, without waiting.
+
+        Args:
+            data: The preprocessed input of the prediction, encoded by the worker for each shadow model.
+            primary_score: The probability of the positive class predicted by the primary model.
+
+        Returns:
+            bool: Whether the work was enqueued or shed.
+        """
+        try:
+            self._queue.put_nowait((data, primary_score))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.shed += 1
+            return False
+
+    def _run(self) -> None:
+        while True:
+            data, primary_score = self._queue.get()
+            threshold: float = float(os.getenv("THRESHOLD", "0.5"))
+            for name, (model, encoder) in self.models.items():
+                start: float = time.perf_counter()
+                try:
+                    shadow_score: float = float(model.predict_proba(encoder.encode(data))[0][1])
+                except Exception as e:
+                    logging.error(f"Error when scoring with the shadow model {name}")
+                    logging.error(e)
+                    with self._lock:
+                        self.stats[name].errors += 1
+                    continue
+                elapsed_ms: float = (time.perf_counter() - start) * 1000
+                with self._lock:
+                    self.stats[name].update(primary_score, shadow_score, threshold, elapsed_ms)
+            self._queue.task_done()
+
+    def to_dict(self) -> dict[str, int | dict[str, dict[str, int | float]]]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "shed": self.shed,
+                "models": {name: stats.to_dict() for name, stats in self.stats.items()},
+            }
@@ -6,6 +6,7 @@ import polars as pl
 from dotenv import load_dotenv
 
 from ..utils.columns import IdentitiesColumns
+from .normalization import NormalizationLookup, normalize_column, save_normalization_vocabulary
 
 load_dotenv()
 logger = logging.getLogger("fraud-detection")
@@ -102,7 +103,7 @@ def fill_nulls_categorical_columns(dataframe: pl.LazyFrame) -> pl.LazyFrame:
     return dataframe.with_columns(*transforms)
 
 
-def process_id_30(identities: pl.LazyFrame) -> pl.LazyFrame:
+def process_id_30(identities: pl.LazyFrame, lookup: NormalizationLookup | None = None) -> pl.LazyFrame:
     """Processes the id_30 column in the identities' data.
 
     It fills null values with the string unknown, and on non-null values, extracts the first part of the string until
@@ -112,24 +113,21 @@ def process_id_30(identities: pl.LazyFrame) -> pl.LazyFrame:
         input: "android 5.0.0"
         output: "android 5"
 
+    The normalization is run once per distinct value of the column.
+
     Args:
         identities (pl.LazyFrame): The identities' data.
+        lookup (NormalizationLookup | None): The optional lookup table of already normalized values.
 
     Returns:
         pl.LazyFrame: The processed identities data with the id_30 column transformed.
     """
     if IdentitiesColumns.id_30 in identities.columns:
-        return identities.with_columns(
-            pl.col(IdentitiesColumns.id_30)
-            .str.to_lowercase()
-            .str.extract(pattern="(^[^\\d]+(\\d+))")
-            .fill_null("unknown")
-            .alias(IdentitiesColumns.id_30)
-        )
+        return normalize_column(identities, IdentitiesColumns.id_30, lookup)
     return identities
 
 
-def process_id_31(identities: pl.LazyFrame) -> pl.LazyFrame:
+def process_id_31(identities: pl.LazyFrame, lookup: NormalizationLookup | None = None) -> pl.LazyFrame:
     """Processes the id_31 column in the identities' data.
 
     It fills null values with the string unknown, and on non-null values, extracts the first part of the string until
@@ -140,27 +138,21 @@ def process_id_31(identities: pl.LazyFrame) -> pl.LazyFrame:
     input: "Chrome 95.0.0 for android"
     output: "chrome 95"
 
+    The normalization is run once per distinct value of the column.
+
     Args:
     identities (pl.LazyFrame): The identities' data.
+    lookup (NormalizationLookup | None): The optional lookup table of already normalized values.
 
     Returns:
     pl.LazyFrame: The processed identities data with the id_30 column transformed.
     """
     if IdentitiesColumns.id_31 in identities.columns:
-        return identities.with_columns(
-            pl.when(pl.col(IdentitiesColumns.id_31).str.contains("/", literal=True))
-            .then(pl.lit("unknown"))
-            .otherwise(pl.col(IdentitiesColumns.id_31).str.to_lowercase().str.extract(pattern="(^[^\\d]+)"))
-            .str.replace_all(pattern="generic", value="")
-            .str.replace_all(pattern="for android", value="")
-            .str.strip_chars()
-            .fill_null("unknown")
-            .alias(IdentitiesColumns.id_31)
-        )
+        return normalize_column(identities, IdentitiesColumns.id_31, lookup)
     return identities
 
 
-def process_id_33(identities: pl.LazyFrame) -> pl.LazyFrame:
+def process_id_33(identities: pl.LazyFrame, lookup: NormalizationLookup | None = None) -> pl.LazyFrame:
     """Processes the id_33 column (screen resolution) in the identities' data.
 
     It fills null values with the string "-1x-1" which indicates a missing screen resolution, and then transforms
@@ -179,29 +171,28 @@ def process_id_33(identities: pl.LazyFrame) -> pl.LazyFrame:
     | 1920  | 1080   |
     | -1    | -1     |
 
+    The normalization is run once per distinct value of the column.
+
     Args:
     identities (pl.LazyFrame): The identities' data.
+    lookup (NormalizationLookup | None): The optional lookup table of already normalized values.
 
     Returns:
     pl.LazyFrame: The processed identities data with the id_30 column transformed.
     """
     if IdentitiesColumns.id_33 in identities.columns:
-        return identities.with_columns(
-            pl.col(IdentitiesColumns.id_33)
-            .fill_null("-1x-1")
-            .str.split("x")
-            .list.eval(pl.element().cast(pl.Int32, strict=False))
-            .list.to_struct(fields=[IdentitiesColumns.width, IdentitiesColumns.height])
-            .alias(IdentitiesColumns.id_33)
-        ).unnest(columns=[IdentitiesColumns.id_33])
+        return normalize_column(identities, IdentitiesColumns.id_33, lookup).unnest(columns=[IdentitiesColumns.id_33])
     return identities
 
 
-def preprocess_identities(identities: pl.LazyFrame | pl.DataFrame) -> pl.LazyFrame:
+def preprocess_identities(
+    identities: pl.LazyFrame | pl.DataFrame, lookup: NormalizationLookup | None = None
+) -> pl.LazyFrame:
     """Preprocesses the identities data.
 
     Args:
         identities (pl.LazyFrame): The identities data.
+        lookup (NormalizationLookup | None): The optional lookup table of already normalized values, used at inference.
 
     Returns:
         pl.LazyFrame: The preprocessed identities data.
@@ -218,9 +209,9 @@ def preprocess_identities(identities: pl.LazyFrame | pl.DataFrame) -> pl.LazyFra
 
     identities = fill_nulls_categorical_columns(identities)
 
-    identities = process_id_30(identities)
-    identities = process_id_31(identities)
-    return process_id_33(identities)
+    identities = process_id_30(identities, lookup)
+    identities = process_id_31(identities, lookup)
+    return process_id_33(identities, lookup)
 
 
 def save_processed_identities_to_file(identities: pl.LazyFrame) -> None:
@@ -256,6 +247,7 @@ def load_and_preprocess_identities() -> pl.LazyFrame:
     if is_processed:
         return identities
 
+    save_normalization_vocabulary(fill_nulls_categorical_columns(identities))
     identities = preprocess_identities(identities)
     identities = identities.with_columns(pl.col(IdentitiesColumns.TransactionID).cast(pl.Int64))
     save_processed_identities_to_file(identities)
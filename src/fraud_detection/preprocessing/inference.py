@@ -4,6 +4,7 @@ import polars as pl
 from dotenv import load_dotenv
 
 from src.fraud_detection.preprocessing.identities import preprocess_identities
+from src.fraud_detection.preprocessing.normalization import NormalizationLookup
 from src.fraud_detection.preprocessing.transactions import preprocess_transactions
 from src.fraud_detection.utils.columns import IdentitiesColumns
 
@@ -30,7 +31,9 @@ def process_id_23_and_id_34(dataframe: pl.DataFrame | pl.LazyFrame) -> pl.DataFr
 
 
 def prepare_data_for_inference(
-    inputs: dict[str, str | int | bool | float], columns_to_select: list[str]
+    inputs: dict[str, str | int | bool | float],
+    columns_to_select: list[str],
+    lookup: NormalizationLookup | None = None,
 ) -> pl.DataFrame:
     if missing_columns := set(columns_to_select).difference(list(inputs.keys())):
         raise ValueError(f"Missing columns: {missing_columns}")
@@ -44,8 +47,8 @@ def prepare_data_for_inference(
     dataframe: pl.DataFrame = pl.from_dict({k: [v] for k, v in inputs.items()})
     dataframe = dataframe.drop(IdentitiesColumns.TransactionID)
 
-    dataframe = preprocess_identities(dataframe)
-    dataframe = preprocess_transactions(dataframe)
+    dataframe = preprocess_identities(dataframe, lookup)
+    dataframe = preprocess_transactions(dataframe, lookup)
 
     dataframe = process_id_23_and_id_34(dataframe)
 
@@ -0,0 +1,242 @@
+import functools
+import json
+import logging
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import polars as pl
+from dotenv import load_dotenv
+
+from ..utils.columns import IdentitiesColumns
+
+load_dotenv()
+logger = logging.getLogger("fraud-detection")
+
+_NORMALIZED_SUFFIX: str = "__normalized"
+
+
+def id_30_normalization() -> pl.Expr:
+    """Returns the expression that keeps the operating system name and its major version, e.g. "android 5.0.0" ->
+    "android 5".
+    """
+    return (
+        pl.col(IdentitiesColumns.id_30)
+        .str.to_lowercase()
+        .str.extract(pattern="(^[^\\d]+(\\d+))")
+        .fill_null("unknown")
+        .alias(IdentitiesColumns.id_30)
+    )
+
+
+def id_31_normalization() -> pl.Expr:
+    """Returns the expression that keeps the browser name, e.g. "Chrome 95.0.0 for android" -> "chrome"."""
+    return (
+        pl.when(pl.col(IdentitiesColumns.id_31).str.contains("/", literal=True))
+        .then(pl.lit("unknown"))
+        .otherwise(pl.col(IdentitiesColumns.id_31).str.to_lowercase().str.extract(pattern="(^[^\\d]+)"))
+        .str.replace_all(pattern="generic", value="")
+        .str.replace_all(pattern="for android", value="")
+        .str.strip_chars()
+        .fill_null("unknown")
+        .alias(IdentitiesColumns.id_31)
+    )
+
+
+def id_33_normalization() -> pl.Expr:
+    """Returns the expression that splits the screen resolution in a struct of width and height, e.g. "1920x1080" ->
+    {1920, 1080}.
+    """
+    return (
+        pl.col(IdentitiesColumns.id_33)
+        .fill_null("-1x-1")
+        .str.split("x")
+        .list.eval(pl.element().cast(pl.Int32, strict=False))
+        .list.to_struct(fields=[IdentitiesColumns.width, IdentitiesColumns.height])
+        .alias(IdentitiesColumns.id_33)
+    )
+
+
+def email_domain_normalization(column: str) -> Callable[[], pl.Expr]:
+    """Returns a factory of the expression that keeps the first part of an email domain, e.g. "gmail.com" -> "gmail".
+
+    Args:
+        column: The email domain column to normalize.
+
+    Returns:
+        Callable[[], pl.Expr]: The expression factory for the given column.
+    """
+
+    def normalization() -> pl.Expr:
+        return pl.col(column).str.split(".").list.first().fill_null("unknown").alias(column)
+
+    return normalization
+
+
+NORMALIZATIONS: dict[str, Callable[[], pl.Expr]] = {
+    IdentitiesColumns.id_30: id_30_normalization,
+    IdentitiesColumns.id_31: id_31_normalization,
+    IdentitiesColumns.id_33: id_33_normalization,
+    "P_emaildomain": email_domain_normalization("P_emaildomain"),
+    "R_emaildomain": email_domain_normalization("R_emaildomain"),
+}
+
+
+class NormalizationLookup:
+    """Bounded LRU table that maps raw string values to their normalized value, one table per column.
+
+    The table is meant to be warmed with the vocabulary seen during training, so that at inference time the regex
+    normalizations are only run on values never seen before.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._tables: dict[str, OrderedDict[str, Any]] = {column: OrderedDict() for column in NORMALIZATIONS}
+        self._lock: threading.Lock = threading.Lock()
+
+    def warm(self, vocabulary: dict[str, dict[str, Any]]) -> None:
+        """Fills the tables with the given vocabulary, keeping at most `maxsize` values per column.
+
+        Args:
+            vocabulary: A dictionary mapping each column to a dictionary of raw value -> normalized value.
+        """
+        with self._lock:
+            for column, values in vocabulary.items():
+                if column not in self._tables:
+                    continue
+                for value, normalized in list(values.items())[: self.maxsize]:
+                    self._tables[column][value] = normalized
+
+    def normalize(self, column: str, values: list[str | None]) -> list[Any]:
+        """Normalizes the given values of a column, computing and caching the values that are not in the table.
+
+        Args:
+            column: The column the values belong to.
+            values: The raw values to normalize.
+
+        Returns:
+            list[Any]: The normalized values.
+        """
+        return [self._normalize_value(column, value) for value in values]
+
+    def _normalize_value(self, column: str, value: str | None) -> Any:
+        if value is None:
+            with self._lock:
+                self.hits += 1
+            return _normalized_null(column)
+
+        table: OrderedDict[str, Any] = self._tables[column]
+        with self._lock:
+            if value in table:
+                self.hits += 1
+                table.move_to_end(value)
+                return table[value]
+            self.misses += 1
+
+        normalized: Any = _normalize_single_value(column, value)
+        with self._lock:
+            table[value] = normalized
+            if len(table) > self.maxsize:
+                table.popitem(last=False)
+        return normalized
+
+
+@functools.cache
+def _normalized_dtype(column: str) -> pl.DataType:
+    return pl.DataFrame({column: [None]}, schema={column: pl.String}).select(NORMALIZATIONS[column]()).schema[column]
+
+
+@functools.cache
+def _normalized_null(column: str) -> Any:
+    return _normalize_single_value(column, None)
+
+
+def _normalize_single_value(column: str, value: str | None) -> Any:
+    return pl.DataFrame({column: [value]}, schema={column: pl.String}).select(NORMALIZATIONS[column]()).item()
+
+
+def normalize_column(
+    dataframe: pl.LazyFrame | pl.DataFrame, column: str, lookup: NormalizationLookup | None = None
+) -> pl.LazyFrame | pl.DataFrame:
+    """Normalizes a string column running the normalization only once per distinct value.
+
+    When a lookup is given and the dataframe is eager (inference), the values are normalized through the lookup table,
+    otherwise the normalization is computed on the unique values of the column and joined back to the dataframe.
+
+    Args:
+        dataframe: The dataframe containing the column.
+        column: The column to normalize, must be one of `NORMALIZATIONS`.
+        lookup: The optional lookup table used at inference time.
+
+    Returns:
+        pl.LazyFrame | pl.DataFrame: The dataframe with the column normalized.
+    """
+    if lookup is not None and isinstance(dataframe, pl.DataFrame):
+        values: list[Any] = lookup.normalize(column, dataframe.get_column(column).cast(pl.String).to_list())
+        return dataframe.with_columns(pl.Series(column, values, dtype=_normalized_dtype(column)))
+
+    normalized_column: str = f"{column}{_NORMALIZED_SUFFIX}"
+    mapping: pl.LazyFrame | pl.DataFrame = dataframe.select(pl.col(column).unique()).with_columns(
+        NORMALIZATIONS[column]().alias(normalized_column)
+    )
+    return (
+        dataframe.join(mapping, on=column, how="left", join_nulls=True)
+        .with_columns(pl.col(normalized_column).alias(column))
+        .select(dataframe.columns)
+    )
+
+
+def build_normalization_vocabulary(dataframe: pl.LazyFrame | pl.DataFrame) -> dict[str, dict[str, Any]]:
+    """Computes the normalized value of every distinct non-null value of the normalized columns in the dataframe.
+
+    Args:
+        dataframe: The dataframe, at the same preprocessing stage in which the columns are normalized.
+
+    Returns:
+        dict[str, dict[str, Any]]: A dictionary mapping each column to a dictionary of raw value -> normalized value.
+    """
+    columns: list[str] = [column for column in NORMALIZATIONS if column in dataframe.columns]
+    # the distinct values of all the columns are gathered in a single pass over the data
+    unique_values: pl.LazyFrame | pl.DataFrame = dataframe.select(
+        pl.col(column).cast(pl.String).unique().drop_nulls().implode() for column in columns
+    )
+    if isinstance(unique_values, pl.LazyFrame):
+        unique_values = unique_values.collect()
+
+    vocabulary: dict[str, dict[str, Any]] = {}
+    for column in columns:
+        mapping: pl.DataFrame = pl.DataFrame(
+            {column: unique_values.item(0, column)}, schema={column: pl.String}
+        ).with_columns(NORMALIZATIONS[column]().alias(f"{column}{_NORMALIZED_SUFFIX}"))
+        vocabulary[column] = dict(zip(*mapping.to_dict(as_series=False).values()))
+    return vocabulary
+
+
+def save_normalization_vocabulary(dataframe: pl.LazyFrame | pl.DataFrame) -> None:
+    """Saves the normalization vocabulary of the dataframe to `NORMALIZATION_VOCABULARY_PATH`, merging it with the
+    vocabulary already saved, if any. If the environment variable is not set, saving is skipped.
+
+    Args:
+        dataframe: The dataframe, at the same preprocessing stage in which the columns are normalized.
+
+    Returns:
+        None
+    """
+    if not os.getenv("NORMALIZATION_VOCABULARY_PATH"):
+        return
+
+    vocabulary_path: pathlib.Path = pathlib.Path(os.getenv("NORMALIZATION_VOCABULARY_PATH"))
+    vocabulary: dict[str, dict[str, Any]] = {}
+    if vocabulary_path.is_file():
+        with vocabulary_path.open("r") as f:
+            vocabulary = json.load(f)
+
+    vocabulary.update(build_normalization_vocabulary(dataframe))
+
+    logger.info(f"Saving normalization vocabulary to {vocabulary_path}")
+    with vocabulary_path.open("w") as f:
+        json.dump(vocabulary, f)
@@ -5,6 +5,8 @@ import pathlib
 import polars as pl
 from dotenv import load_dotenv
 
+from .normalization import NormalizationLookup, normalize_column, save_normalization_vocabulary
+
 load_dotenv()
 logger = logging.getLogger("fraud-detection")
 
@@ -41,31 +43,43 @@ def load_transactions() -> tuple[pl.LazyFrame, bool]:
     return load_preprocessed_transactions(), True
 
 
-def fill_nulls_categorical_columns(dataframe: pl.LazyFrame) -> pl.LazyFrame:
+def fill_nulls_categorical_columns(
+    dataframe: pl.LazyFrame, lookup: NormalizationLookup | None = None
+) -> pl.LazyFrame:
     """Fills null values in categorical columns with "unknown".
 
+    The email domains are also reduced to their first part, running the split once per distinct domain.
+
     Args:
         dataframe: The input DataFrame.
+        lookup: The optional lookup table of already normalized values, used at inference.
 
     Returns:
         pl.LazyFrame: The DataFrame with null values in categorical columns filled with "unknown".
     """
     transforms: list[pl.Expr] = []
+    email_columns: list[str] = []
 
     for column in dataframe.columns:
         if column.startswith("M") or column in ["card4", "card6", "ProductCD"]:
             transforms.append(pl.col(column).fill_null("unknown"))
         elif column in {"R_emaildomain", "P_emaildomain"}:
-            transforms.append(pl.col(column).str.split(".").list.first().fill_null("unknown"))
+            email_columns.append(column)
 
-    return dataframe.with_columns(*transforms)
+    dataframe = dataframe.with_columns(*transforms)
+    for column in email_columns:
+        dataframe = normalize_column(dataframe, column, lookup)
+    return dataframe
 
 
-def preprocess_transactions(transactions: pl.LazyFrame) -> pl.LazyFrame:
+def preprocess_transactions(
+    transactions: pl.LazyFrame, lookup: NormalizationLookup | None = None
+) -> pl.LazyFrame:
     """Preprocesses the transactions data.
 
     Args:
         transactions (pl.LazyFrame): The transactions data.
+        lookup (NormalizationLookup | None): The optional lookup table of already normalized values, used at inference.
 
     Returns:
         pl.LazyFrame: The preprocessed transactions data.
@@ -78,7 +92,7 @@ def preprocess_transactions(transactions: pl.LazyFrame) -> pl.LazyFrame:
         ]
     )
 
-    return fill_nulls_categorical_columns(transactions)
+    return fill_nulls_categorical_columns(transactions, lookup)
 
 
 def save_processed_transactions_to_file(transactions: pl.LazyFrame) -> None:
@@ -114,6 +128,7 @@ def load_and_preprocess_transactions() -> pl.LazyFrame:
     if is_processed:
         return transactions
 
+    save_normalization_vocabulary(transactions)
     transactions = preprocess_transactions(transactions)
     transactions = transactions.with_columns(pl.col("TransactionID").cast(pl.Int64))
     save_processed_transactions_to_file(transactions)
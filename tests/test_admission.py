@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from src.fraud_detection.inference.admission import AdmissionController, AdmissionRejected, parse_deadline
+
+
+@pytest.fixture
+def busy_controller():
+    controller = AdmissionController(max_in_flight=1, max_queue=1)
+    release = threading.Event()
+    admitted = threading.Event()
+
+    def hold_slot():
+        with controller.admit():
+            admitted.set()
+            release.wait()
+
+    worker = threading.Thread(target=hold_slot)
+    worker.start()
+    admitted.wait()
+    yield controller
+    release.set()
+    worker.join()
+
+
+def test_admit_happy_path():
+    # Arrange
+    controller = AdmissionController(max_in_flight=2, max_queue=0)
+
+    # Act
+    with controller.admit(parse_deadline("1000")):
+        in_flight = controller.in_flight
+
+    # Assert
+    assert in_flight == 1
+    assert controller.in_flight == 0
+
+
+def test_admit_rejects_expired_deadline_in_queue(busy_controller):
+    # Act
+    with pytest.raises(AdmissionRejected) as exc_info:
+        with busy_controller.admit(time.monotonic() + 0.05):
+            pass
+
+    # Assert
+    assert exc_info.value.status_code == 503
+    assert busy_controller.queued == 0
+
+
+def test_admit_rejects_when_queue_is_full(busy_controller):
+    # Arrange
+    def wait_in_queue():
+        with pytest.raises(AdmissionRejected):
+            with busy_controller.admit(time.monotonic() + 0.2):
+                pass
+
+    waiter = threading.Thread(target=wait_in_queue)
+    waiter.start()
+    while busy_controller.queued == 0:
+        time.sleep(0.001)
+
+    # Act
+    with pytest.raises(AdmissionRejected) as exc_info:
+        with busy_controller.admit():
+            pass
+    waiter.join()
+
+    # Assert
+    assert exc_info.value.status_code == 429
+
+
+def test_admit_rejects_deadline_that_cannot_be_met(busy_controller):
+    # Arrange
+    busy_controller.service_time = 1.0
+
+    # Act
+    with pytest.raises(AdmissionRejected) as exc_info:
+        with busy_controller.admit(time.monotonic() + 0.5):
+            pass
+
+    # Assert
+    assert exc_info.value.status_code == 503
+    assert busy_controller.queued == 0
+
+
+@pytest.mark.parametrize(
+    "header, expected_none",
+    [("250", False), (None, True), ("not-a-number", True), ("inf", True), ("-inf", True), ("nan", True)],
+)
+def test_parse_deadline(header, expected_none, monkeypatch):
+    # Arrange
+    monkeypatch.delenv("ADMISSION_DEFAULT_DEADLINE_MS", raising=False)
+
+    # Act
+    result = parse_deadline(header)
+
+    # Assert
+    assert (result is None) is expected_none
+
+
+@pytest.mark.parametrize("header", ["inf", "nan"])
+def test_admit_queued_with_non_finite_deadline_header(busy_controller, header):
+    # Arrange
+    def release_slot():
+        while busy_controller.queued == 0:
+            time.sleep(0.001)
+        busy_controller.max_in_flight = 2
+        with busy_controller._condition:
+            busy_controller._condition.notify()
+
+    releaser = threading.Thread(target=release_slot)
+    releaser.start()
+
+    # Act
+    with busy_controller.admit(parse_deadline(header)):
+        in_flight = busy_controller.in_flight
+    releaser.join()
+
+    # Assert
+    assert in_flight == 2
+    assert busy_controller.queued == 0
+
+
+def test_admit_rejects_deadline_passed_on_arrival():
+    # Arrange
+    controller = AdmissionController(max_in_flight=1, max_queue=1)
+
+    # Act
+    with pytest.raises(AdmissionRejected) as exc_info:
+        with controller.admit(time.monotonic() - 1):
+            pass
+
+    # Assert
+    assert exc_info.value.status_code == 503
+    assert "arrived" in exc_info.value.reason
+
+
+def test_admit_async_waits_on_the_event_loop():
+    # Arrange
+    controller = AdmissionController(max_in_flight=1, max_queue=1)
+
+    async def request(deadline, release=None):
+        async with controller.admit_async(deadline):
+            if release is not None:
+                await release.wait()
+
+    async def run():
+        release = asyncio.Event()
+        holder = asyncio.create_task(request(None, release))
+        await asyncio.sleep(0)
+        # the first request waits in the queue until its deadline expires, the second one finds the queue full
+        results = await asyncio.gather(
+            request(time.monotonic() + 0.05), request(time.monotonic() + 1), return_exceptions=True
+        )
+        release.set()
+        await holder
+        return results
+
+    # Act
+    results = asyncio.run(run())
+
+    # Assert
+    assert [result.status_code for result in results] == [503, 429]
+    assert "expired while waiting" in results[0].reason
+    assert controller.in_flight == 0
+    assert controller.queued == 0
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+from lightgbm import LGBMClassifier
+from sklearn.calibration import CalibratedClassifierCV
+from src.fraud_detection.inference.encoding import ModelInputEncoder
+
+
+@pytest.fixture(scope="module")
+def data() -> pl.DataFrame:
+    rng = np.random.default_rng(42)
+    return pl.DataFrame(
+        {
+            "TransactionAmt": rng.lognormal(3, 1, size=400),
+            "P_emaildomain": rng.choice(["gmail", "yahoo", "hotmail"], size=400),
+            "id_02": rng.normal(size=400).astype(np.float32),
+            "id_31": rng.choice(["chrome", "safari"], size=400),
+        }
+    ).with_columns(pl.col(pl.String).cast(pl.Categorical))
+
+
+@pytest.fixture(scope="module")
+def model(data) -> CalibratedClassifierCV:
+    features = data.to_pandas()
+    target = ((features["TransactionAmt"] > 20) ^ (features["P_emaildomain"] == "gmail")).astype(int)
+    classifier = CalibratedClassifierCV(LGBMClassifier(n_estimators=20, verbose=-1), cv=3)
+    return classifier.fit(features, target)
+
+
+def test_from_model(model, data):
+    # Act
+    encoder = ModelInputEncoder.from_model(model, data.columns)
+
+    # Assert
+    assert set(encoder.categories) == {"P_emaildomain", "id_31"}
+
+
+@pytest.mark.parametrize("rows, test_id", [(1, "single_row"), (50, "batch")])
+def test_encode_matches_pandas_predictions(model, data, rows, test_id):
+    # Arrange
+    encoder = ModelInputEncoder.from_model(model, data.columns)
+    inputs = data.head(rows)
+
+    # Act
+    matrix = encoder.encode(inputs)
+
+    # Assert
+    assert matrix.shape == (rows, len(data.columns))
+    assert matrix.flags.c_contiguous
+    np.testing.assert_allclose(model.predict_proba(matrix), model.predict_proba(inputs.to_pandas()))
+
+
+def test_encode_unseen_category_as_missing(model, data):
+    # Arrange
+    encoder = ModelInputEncoder.from_model(model, data.columns)
+    inputs = data.head(1).with_columns(pl.lit("aol").cast(pl.Categorical).alias("P_emaildomain"))
+    expected_inputs = inputs.to_pandas()
+    expected_inputs["P_emaildomain"] = pd.Categorical([np.nan], categories=["gmail", "hotmail", "yahoo"])
+
+    # Act
+    matrix = encoder.encode(inputs)
+
+    # Assert
+    assert np.isnan(matrix[0, data.columns.index("P_emaildomain")])
+    np.testing.assert_allclose(model.predict_proba(matrix), model.predict_proba(expected_inputs))
@@ -0,0 +1,94 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMClassifier
+from sklearn.calibration import CalibratedClassifierCV
+from src.fraud_detection.inference import explain
+from src.fraud_detection.inference.explain import explain_prediction
+
+
+@pytest.fixture(scope="module")
+def data() -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame(
+        {
+            "TransactionAmt": rng.normal(size=400),
+            "id_02": rng.normal(size=400),
+            "noise": rng.normal(size=400),
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def target(data) -> pd.Series:
+    return (data["TransactionAmt"] + 0.1 * data["id_02"] > 0).astype(int)
+
+
+@pytest.fixture(scope="module", params=["cv", "prefit"])
+def model(request, data, target) -> CalibratedClassifierCV:
+    if request.param == "prefit":
+        # the model served by the repo, built by `calibrate_model` in notebook/training.ipynb, has a single estimator
+        estimator = LGBMClassifier(n_estimators=20, verbose=-1).fit(data, target)
+        return CalibratedClassifierCV(estimator, cv="prefit").fit(data, target)
+    return CalibratedClassifierCV(LGBMClassifier(n_estimators=20, verbose=-1), cv=3).fit(data, target)
+
+
+@pytest.fixture
+def slow_estimator(model, monkeypatch):
+    release = threading.Event()
+    estimator = model.calibrated_classifiers_[0].estimator
+    predict = estimator.predict
+
+    def slow_predict(*args, **kwargs):
+        release.wait()
+        return predict(*args, **kwargs)
+
+    monkeypatch.setattr(estimator, "predict", slow_predict)
+    yield release
+    release.set()
+    # wait for the worker to finish the pending explanation
+    explain._executor.submit(lambda: None).result()
+
+
+def test_explain_prediction_happy_path(model, data):
+    # Act
+    result = explain_prediction(model, data.head(1).to_numpy(), list(data.columns), top_k=2, time_budget_ms=10_000)
+
+    # Assert
+    assert len(result["features"]) == 2
+    assert result["features"][0]["feature"] == "TransactionAmt"
+    contributions = [abs(feature["contribution"]) for feature in result["features"]]
+    assert contributions == sorted(contributions, reverse=True)
+    assert result["complete"] is True
+
+
+def test_explain_prediction_over_budget(model, data, slow_estimator):
+    # Arrange
+    over_budget = explain.explanation_stats.over_budget
+    skipped = explain.explanation_stats.skipped
+
+    # Act
+    timed_out = explain_prediction(model, data.head(1).to_numpy(), list(data.columns), time_budget_ms=10)
+    worker_busy = explain_prediction(model, data.head(1).to_numpy(), list(data.columns), time_budget_ms=10)
+
+    # Assert
+    for result in [timed_out, worker_busy]:
+        assert result["features"] == []
+        assert result["complete"] is False
+    assert explain.explanation_stats.over_budget == over_budget + 2
+    assert explain.explanation_stats.skipped == skipped + 1
+
+
+def test_explain_prediction_waits_for_busy_worker(model, data, slow_estimator):
+    # Arrange
+    explain_prediction(model, data.head(1).to_numpy(), list(data.columns), time_budget_ms=10)
+    threading.Timer(0.05, slow_estimator.set).start()
+
+    # Act
+    result = explain_prediction(model, data.head(1).to_numpy(), list(data.columns), top_k=2, time_budget_ms=10_000)
+
+    # Assert
+    assert len(result["features"]) == 2
+    assert result["complete"] is True
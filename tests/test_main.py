@@ -0,0 +1,115 @@
+import importlib
+import json
+import pathlib
+import pickle
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+import polars as pl
+import pytest
+from fastapi.testclient import TestClient
+from lightgbm import LGBMClassifier
+from sklearn.calibration import CalibratedClassifierCV
+from src.fraud_detection.preprocessing.inference import prepare_data_for_inference
+
+
+@pytest.fixture(scope="module")
+def request_data() -> dict[str, str | int | bool | float]:
+    with (pathlib.Path(__file__).parents[1] / "data" / "test_json.json").open("r") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def client(request_data, tmp_path_factory) -> TestClient:
+    columns = list(request_data)
+    features = prepare_data_for_inference(request_data, columns)
+
+    rng = np.random.default_rng(42)
+    training = pl.DataFrame(
+        {
+            column: rng.choice([features.item(0, column), "unknown"], size=500)
+            if dtype == pl.Categorical
+            else rng.normal(float(features.item(0, column)), 10, size=500)
+            for column, dtype in features.schema.items()
+        }
+    ).with_columns(pl.col(pl.String).cast(pl.Categorical))
+    model = CalibratedClassifierCV(LGBMClassifier(n_estimators=10, verbose=-1), cv=3)
+    model.fit(training.to_pandas(), rng.integers(0, 2, size=500))
+
+    directory = tmp_path_factory.mktemp("model")
+    with (directory / "model.pkl").open("wb") as f:
+        pickle.dump(model, f)
+    (directory / "columns").write_text(str(columns))
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MODEL_PATH", str(directory / "model.pkl"))
+        monkeypatch.setenv("COLUMNS_PATH", str(directory / "columns"))
+        # every transaction is flagged, so that the explanation is always computed
+        monkeypatch.setenv("THRESHOLD", "0")
+        sys.modules.pop("src.fraud_detection.inference.main", None)
+        main = importlib.import_module("src.fraud_detection.inference.main")
+        yield TestClient(main.app)
+
+
+@pytest.mark.parametrize(
+    "explain, expected_explanation, test_id",
+    [
+        (True, True, "happy_path_explain"),
+        (False, False, "happy_path_no_explain"),
+    ],
+)
+def test_predict(client, request_data, explain, expected_explanation, test_id):
+    # Act
+    response = client.post("/predict", params={"explain": explain}, json=request_data)
+
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["message"] == "Prediction successfully"
+    assert ("explanation" in body["data"]) is expected_explanation
+    if expected_explanation:
+        assert len(body["data"]["explanation"]["features"]) == 5
+
+
+def test_predict_submits_shadow_scoring_after_the_response(client, request_data, monkeypatch):
+    # Arrange
+    main = sys.modules["src.fraud_detection.inference.main"]
+    shadow_scorer = MagicMock()
+    explain_prediction = main.explain_prediction
+
+    def explain_before_shadow(*args, **kwargs):
+        assert not shadow_scorer.submit.called
+        return explain_prediction(*args, **kwargs)
+
+    monkeypatch.setattr(main, "shadow_scorer", shadow_scorer)
+    monkeypatch.setattr(main, "explain_prediction", explain_before_shadow)
+
+    # Act
+    response = client.post("/predict", params={"explain": True}, json=request_data)
+
+    # Assert
+    assert response.status_code == 200
+    assert "explanation" in response.json()["data"]
+    shadow_scorer.submit.assert_called_once()
+    assert shadow_scorer.submit.call_args.args[1] == response.json()["data"]["probability"]
+
+
+@pytest.mark.parametrize(
+    "params, expected_status_code, test_id",
+    [
+        ({"seconds": "abc"}, 422, "seconds_not_a_number"),
+        ({"seconds": "inf"}, 422, "seconds_not_finite"),
+        ({"requests": "0"}, 422, "requests_zero"),
+        ({"requests": "-1"}, 422, "requests_negative"),
+    ],
+)
+def test_start_profiling_validates_params(client, monkeypatch, params, expected_status_code, test_id):
+    # Arrange
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+
+    # Act
+    response = client.post("/admin/profile", params=params, headers={"X-Admin-Token": "secret"})
+
+    # Assert
+    assert response.status_code == expected_status_code
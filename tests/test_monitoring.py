@@ -0,0 +1,99 @@
+import numpy as np
+import polars as pl
+import pytest
+from src.fraud_detection.inference.monitoring import (
+    OTHER_CATEGORY,
+    DriftMonitor,
+    HeavyHitters,
+    compute_reference,
+    population_stability_index,
+)
+
+
+@pytest.fixture(scope="module")
+def reference() -> dict:
+    rng = np.random.default_rng(42)
+    data = pl.LazyFrame(
+        {
+            "TransactionAmt": rng.lognormal(3, 1, size=5000),
+            "P_emaildomain": rng.choice(["gmail", "yahoo", "hotmail", "anonymous"], size=5000),
+        }
+    )
+    return compute_reference(
+        data, ["TransactionAmt"], ["P_emaildomain"], scores=rng.beta(1, 20, size=5000), top_k=3
+    )
+
+
+def test_compute_reference(reference):
+    # Assert
+    assert len(reference["numeric"]["TransactionAmt"]["edges"]) == 9
+    assert sum(reference["numeric"]["TransactionAmt"]["proportions"]) == pytest.approx(1)
+    assert len(reference["categorical"]["P_emaildomain"]["proportions"]) == 4
+    assert OTHER_CATEGORY in reference["categorical"]["P_emaildomain"]["proportions"]
+    assert sum(reference["score"]["proportions"]) == pytest.approx(1)
+
+
+@pytest.mark.parametrize(
+    "amount_scale, expected_drift, test_id",
+    [
+        (1, False, "happy_path_same_distribution"),
+        (100, True, "shifted_distribution"),
+    ],
+)
+def test_drift_monitor(reference, amount_scale, expected_drift, test_id):
+    # Arrange
+    rng = np.random.default_rng(0)
+    monitor = DriftMonitor(reference)
+
+    # Act
+    for amount, domain, score in zip(
+        rng.lognormal(3, 1, size=2000) * amount_scale,
+        rng.choice(["gmail", "yahoo", "hotmail", "anonymous"], size=2000),
+        rng.beta(1, 20, size=2000),
+    ):
+        monitor.update({"TransactionAmt": amount, "P_emaildomain": domain}, score)
+    result = monitor.to_dict()
+
+    # Assert
+    assert result["count"] == 2000
+    assert (result["features"]["TransactionAmt"]["psi"] > 0.25) is expected_drift
+    assert result["features"]["P_emaildomain"]["psi"] < 0.1
+    assert result["score"]["psi"] < 0.1
+
+
+@pytest.mark.parametrize("updates, test_id", [(0, "empty"), (99, "below_min_samples")])
+def test_drift_monitor_does_not_report_psi_on_few_samples(reference, updates, test_id):
+    # Arrange
+    monitor = DriftMonitor(reference, min_samples=100)
+
+    # Act
+    for _ in range(updates):
+        monitor.update({"TransactionAmt": 20.0, "P_emaildomain": "gmail"}, 0.05)
+    result = monitor.to_dict()
+
+    # Assert
+    assert result["count"] == updates
+    assert result["features"]["TransactionAmt"]["psi"] is None
+    assert result["features"]["P_emaildomain"]["psi"] is None
+    assert result["score"]["psi"] is None
+
+
+def test_heavy_hitters_keeps_most_frequent_values():
+    # Arrange
+    heavy_hitters = HeavyHitters(capacity=2)
+
+    # Act
+    for value in ["gmail"] * 10 + ["yahoo", "aol", "hotmail"] + ["gmail"] * 5:
+        heavy_hitters.update(value)
+
+    # Assert
+    assert len(heavy_hitters.counts) == 2
+    assert next(iter(heavy_hitters.top())) == "gmail"
+
+
+def test_population_stability_index_is_zero_for_same_distribution():
+    # Act
+    result = population_stability_index([0.2, 0.3, 0.5], [0.2, 0.3, 0.5])
+
+    # Assert
+    assert result == pytest.approx(0)
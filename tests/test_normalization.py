@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+from src.fraud_detection.preprocessing.normalization import (
+    NORMALIZATIONS,
+    NormalizationLookup,
+    build_normalization_vocabulary,
+    normalize_column,
+)
+
+
+@pytest.fixture
+def identities() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "id_30": ["android 7.0", "ios 11.2.1", None, "android 7.0", "Windows 10"],
+            "id_31": ["chrome 63.0 for android", "mobile safari 11.0", "59843 /build 1465416", None, "chrome 63.0"],
+            "id_33": ["1920x1080", None, "2220x1080", "1920x1080", "1920x1080"],
+            "P_emaildomain": ["gmail.com", "yahoo.com.mx", None, "gmail.com", "gmail"],
+        }
+    )
+
+
+@pytest.mark.parametrize("column", ["id_30", "id_31", "id_33", "P_emaildomain"])
+def test_normalize_column_matches_row_wise_expression(identities, column):
+    # Arrange
+    expected = identities.with_columns(NORMALIZATIONS[column]())
+
+    # Act
+    result = normalize_column(identities.lazy(), column).collect()
+
+    # Assert
+    assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize("column", ["id_30", "id_31", "id_33", "P_emaildomain"])
+def test_normalize_column_with_lookup_matches_row_wise_expression(identities, column):
+    # Arrange
+    expected = identities.with_columns(NORMALIZATIONS[column]())
+    lookup = NormalizationLookup()
+    lookup.warm(build_normalization_vocabulary(identities.head(2)))
+
+    # Act
+    result = normalize_column(identities, column, lookup)
+
+    # Assert
+    assert_frame_equal(result, expected)
+
+
+def test_normalization_lookup_is_bounded():
+    # Arrange
+    lookup = NormalizationLookup(maxsize=2)
+    lookup.warm({"id_30": {"android 7.0": "android 7", "ios 11.2.1": "ios 11", "windows 10": "windows 10"}})
+
+    # Act
+    result = lookup.normalize("id_30", ["android 7.0", "windows 10", "android 7.0"])
+
+    # Assert
+    assert result == ["android 7", "windows 10", "android 7"]
+    assert lookup.hits == 2
+    assert lookup.misses == 1
+    assert len(lookup._tables["id_30"]) == 2
+
+
+@pytest.mark.parametrize("column", ["id_30", "id_31", "id_33", "P_emaildomain"])
+def test_normalization_lookup_computes_null_once(column):
+    # Arrange
+    lookup = NormalizationLookup()
+    expected = pl.DataFrame({column: [None]}, schema={column: pl.String}).select(NORMALIZATIONS[column]()).item()
+
+    # Act
+    with patch("src.fraud_detection.preprocessing.normalization._normalize_single_value") as mock_normalize:
+        mock_normalize.return_value = expected
+        result = lookup.normalize(column, [None, None, None])
+
+    # Assert
+    assert result == [expected] * 3
+    assert mock_normalize.call_count <= 1
+    assert lookup.hits == 3
+    assert lookup.misses == 0
+
+
+def test_build_normalization_vocabulary_scans_data_once(identities):
+    # Arrange
+    collect = pl.LazyFrame.collect
+
+    # Act
+    with patch.object(pl.LazyFrame, "collect", autospec=True, side_effect=collect) as mock_collect:
+        result = build_normalization_vocabulary(identities.lazy())
+
+    # Assert
+    # eager operations on the small unique-value frames also go through `collect`, flagged as `_eager`
+    assert len([call for call in mock_collect.call_args_list if not call.kwargs.get("_eager")]) == 1
+    assert set(result) == {"id_30", "id_31", "id_33", "P_emaildomain"}
+    assert result["id_30"] == {"android 7.0": "android 7", "ios 11.2.1": "ios 11", "Windows 10": "windows 10"}
+    assert result["id_33"] == {
+        "1920x1080": {"width": 1920, "height": 1080},
+        "2220x1080": {"width": 2220, "height": 1080},
+    }
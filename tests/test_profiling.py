@@ -0,0 +1,74 @@
+import pathlib
+import time
+
+import pytest
+from src.fraud_detection.inference.profiling import Profiler, is_admin
+
+
+def busy_handler(iterations: int) -> int:
+    return sum(i * i for i in range(iterations))
+
+
+def wait_for_session(profiler: Profiler, timeout: float = 5) -> None:
+    start = time.monotonic()
+    while profiler.active and time.monotonic() - start < timeout:
+        time.sleep(0.01)
+
+
+def test_profiler_writes_files_after_requests(tmp_path):
+    # Arrange
+    profiler = Profiler(output_dir=tmp_path, sample_interval=0.001)
+    handler = profiler.wrap(busy_handler)
+
+    # Act
+    profiler.start(requests=3)
+    results = [handler(200_000) for _ in range(3)]
+    wait_for_session(profiler)
+
+    # Assert
+    assert results == [busy_handler(200_000)] * 3
+    status = profiler.status()
+    assert status["active"] is False
+    assert status["requests"] == 3
+    suffixes = sorted(pathlib.Path(file).suffix for file in status["last_files"])
+    assert suffixes == [".collapsed", ".prof"]
+    collapsed = pathlib.Path(status["last_files"][-1]).read_text()
+    assert "busy_handler" in collapsed
+
+
+def test_profiler_stops_after_seconds(tmp_path):
+    # Arrange
+    profiler = Profiler(output_dir=tmp_path)
+
+    # Act
+    profiler.start(seconds=0.05)
+    with pytest.raises(RuntimeError):
+        profiler.start(seconds=0.05)
+    wait_for_session(profiler)
+
+    # Assert
+    assert profiler.active is False
+    assert [pathlib.Path(file).suffix for file in profiler.status()["last_files"]] == [".collapsed"]
+
+
+@pytest.mark.parametrize(
+    "admin_token, token, expected",
+    [
+        ("secret", "secret", True),
+        ("secret", "wrong", False),
+        ("secret", None, False),
+        (None, "secret", False),
+    ],
+)
+def test_is_admin(admin_token, token, expected, monkeypatch):
+    # Arrange
+    if admin_token is None:
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    else:
+        monkeypatch.setenv("ADMIN_TOKEN", admin_token)
+
+    # Act
+    result = is_admin(token)
+
+    # Assert
+    assert result is expected
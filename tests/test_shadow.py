@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+import polars as pl
+import pytest
+from src.fraud_detection.inference import loaders
+from src.fraud_detection.inference.encoding import ModelInputEncoder
+from src.fraud_detection.inference.shadow import ShadowScorer
+
+encoder = ModelInputEncoder(["TransactionAmt"], categories={})
+
+
+class ConstantModel:
+    def __init__(self, score: float, release: threading.Event | None = None) -> None:
+        self.score = score
+        self.release = release
+
+    def predict_proba(self, data: np.ndarray) -> np.ndarray:
+        if self.release is not None:
+            self.release.wait()
+        return np.array([[1 - self.score, self.score]])
+
+
+def test_shadow_scorer_aggregates_agreement(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("THRESHOLD", "0.5")
+    scorer = ShadowScorer({"agrees": (ConstantModel(0.8), encoder), "disagrees": (ConstantModel(0.2), encoder)})
+    data = pl.DataFrame({"TransactionAmt": [50.0]})
+
+    # Act
+    for _ in range(10):
+        scorer.submit(data, primary_score=0.7)
+    scorer._queue.join()
+    result = scorer.to_dict()
+
+    # Assert
+    assert result["shed"] == 0
+    assert result["models"]["agrees"]["count"] == 10
+    assert result["models"]["agrees"]["agreement"] == 1.0
+    assert result["models"]["disagrees"]["agreement"] == 0.0
+    assert abs(result["models"]["disagrees"]["mean_absolute_difference"] - 0.5) < 1e-9
+
+
+def test_shadow_scorer_sheds_when_queue_is_full():
+    # Arrange
+    release = threading.Event()
+    scorer = ShadowScorer({"slow": (ConstantModel(0.5, release), encoder)}, max_queue=2)
+    data = pl.DataFrame({"TransactionAmt": [50.0]})
+
+    # Act
+    submitted = [scorer.submit(data, primary_score=0.5) for _ in range(10)]
+    release.set()
+    scorer._queue.join()
+
+    # Assert
+    assert not all(submitted)
+    assert scorer.to_dict()["shed"] == submitted.count(False)
+    assert scorer.to_dict()["models"]["slow"]["count"] == submitted.count(True)
+
+
+def test_load_shadow_scorer_rejects_duplicate_names(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("SHADOW_MODEL_PATHS", "/models/a/model.pkl,/models/b/model.pkl")
+    monkeypatch.setattr(loaders, "load_model", lambda model_path: ConstantModel(0.5))
+    monkeypatch.setattr(ModelInputEncoder, "from_model", classmethod(lambda cls, model, columns: encoder))
+
+    # Act
+    with pytest.raises(ValueError) as exc_info:
+        loaders.load_shadow_scorer(["TransactionAmt"])
+
+    # Assert
+    assert "duplicated" in str(exc_info.value)